@@ -1,12 +1,22 @@
 # app.py - Full AI Resume Scorer (updated: Jinja globals exposed)
+import io
 import os
 import re
 import json
+import math
+import hashlib
+import ahocorasick
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from collections import Counter
 from datetime import datetime
 from flask import (Flask, render_template, request, redirect, url_for, flash, send_from_directory)
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import load_only
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user, UserMixin
 
 # Optional docx extractor
@@ -48,30 +58,111 @@ else:
         "kubernetes","sql","pandas","numpy","tensorflow","pytorch","nlp","machine learning"
     ]
 
+# Aho-Corasick automaton over the skill dictionary: one linear scan per text
+# instead of one substring search per skill.
+SKILL_AC = ahocorasick.Automaton()
+for s in SKILLS:
+    SKILL_AC.add_word(s, s)
+SKILL_AC.make_automaton()
+
+# Each skill gets a bit position so a skill set packs into one int and
+# overlap checks become mask-and + popcount instead of Python set ops.
+SKILL_IDX = {s: i for i, s in enumerate(SKILLS)}
+
+def skills_to_mask(skills):
+    mask = 0
+    for s in skills:
+        i = SKILL_IDX.get(s.lower())
+        if i is not None:
+            mask |= 1 << i
+    return mask
+
+def mask_to_skills(mask):
+    # walk set bits only; sparse masks skip the rest of the dictionary
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(SKILLS[low.bit_length()-1])
+        mask ^= low
+    return out
+
 # ---------------- Models ----------------
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(220), unique=True, nullable=False)
+    email = db.Column(db.String(220), unique=True, index=True, nullable=False)
     password_hash = db.Column(db.String(300), nullable=False)
     role = db.Column(db.String(50), nullable=False)  # seeker or recruiter
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class Meta(db.Model):
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(200), nullable=True)
+
 class Resume(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(300), nullable=False)
     original_filename = db.Column(db.String(300), nullable=False)
-    text = db.Column(db.Text, nullable=True)
     uploaded_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    tf_json = db.Column(db.Text, nullable=True)   # term-frequency vector, precomputed at upload
+    norm = db.Column(db.Float, nullable=True)     # euclidean norm of the TF vector
+    skill_mask = db.Column(db.Text, nullable=True)  # extracted-skill bitmask, hex string
+    simhash = db.Column(db.Text, nullable=True)     # 64-bit simhash signature, hex string
+
+    @property
+    def text_path(self):
+        return os.path.join(app.config["UPLOAD_FOLDER"], self.filename + ".txt")
+
+    @property
+    def text(self):
+        # extracted text lives in a sidecar file, not the db; metadata
+        # queries stop hauling whole documents. Read lazily, cache per instance.
+        if getattr(self, "_text_cache", None) is None:
+            try:
+                with open(self.text_path, "r", encoding="utf-8", errors="ignore") as f:
+                    self._text_cache = f.read()
+            except OSError:
+                self._text_cache = ""
+        return self._text_cache
+
+# Index the two resume listing patterns (per-seeker history, recruiter
+# recency) so they become index seeks instead of full-table scans.
+db.Index('ix_resume_uploader_uploaded', Resume.uploaded_by, Resume.uploaded_at.desc())
+db.Index('ix_resume_uploaded_at', Resume.uploaded_at.desc())
+
+def ensure_resume_schema():
+    # No migration tooling here — patch an existing sqlite db in place.
+    cols = {row[1] for row in db.session.execute(db.text("PRAGMA table_info(resume)"))}
+    for name, sqltype in (("tf_json", "TEXT"), ("norm", "FLOAT"), ("skill_mask", "TEXT"), ("simhash", "TEXT")):
+        if name not in cols:
+            db.session.execute(db.text(f"ALTER TABLE resume ADD COLUMN {name} {sqltype}"))
+    if "text" in cols:
+        # resume text moved to sidecar files: export legacy rows, drop the column
+        rows = db.session.execute(db.text("SELECT filename, text FROM resume WHERE text IS NOT NULL"))
+        for fname, txt in rows:
+            p = os.path.join(app.config["UPLOAD_FOLDER"], fname + ".txt")
+            if not os.path.exists(p):
+                with open(p, "w", encoding="utf-8") as f:
+                    f.write(txt)
+        db.session.execute(db.text("ALTER TABLE resume DROP COLUMN text"))
+    # create_all skips existing tables, so backfill the indexes directly
+    db.session.execute(db.text("CREATE INDEX IF NOT EXISTS ix_resume_uploader_uploaded ON resume (uploaded_by, uploaded_at DESC)"))
+    db.session.execute(db.text("CREATE INDEX IF NOT EXISTS ix_resume_uploaded_at ON resume (uploaded_at DESC)"))
+    db.session.execute(db.text("CREATE UNIQUE INDEX IF NOT EXISTS ix_user_email ON user (email)"))
+    db.session.commit()
 
 with app.app_context():
     db.create_all()
-    # create demo users
-    if not User.query.filter_by(email="jobseeker@example.com").first():
-        db.session.add(User(email="jobseeker@example.com", password_hash=generate_password_hash("seeker123"), role="seeker"))
-    if not User.query.filter_by(email="recruiter@example.com").first():
-        db.session.add(User(email="recruiter@example.com", password_hash=generate_password_hash("recruit123"), role="recruiter"))
-    db.session.commit()
+    ensure_resume_schema()
+    # create demo users once; the guard row makes later boots a single SELECT
+    if db.session.get(Meta, "seeded") is None:
+        if not User.query.filter_by(email="jobseeker@example.com").first():
+            db.session.add_all([
+                User(email="jobseeker@example.com", password_hash=generate_password_hash("seeker123"), role="seeker"),
+                User(email="recruiter@example.com", password_hash=generate_password_hash("recruit123"), role="recruiter"),
+            ])
+        db.session.add(Meta(key="seeded", value="1"))
+        db.session.commit()
 
 @login_manager.user_loader
 def load_user(uid):
@@ -86,7 +177,8 @@ def extract_text_from_docx(path):
         return ""
     try:
         d = docx.Document(path)
-        return "\n".join([p.text for p in d.paragraphs])
+        # generator into join: no intermediate list of paragraph texts
+        return "\n".join(p.text for p in d.paragraphs)
     except Exception:
         return ""
 
@@ -102,48 +194,233 @@ def extract_text_from_file(path, original_filename):
         return ""
     return ""
 
+_TOK_RE = re.compile(r"[a-z0-9\+]+")
+
 def normalize_text(t):
-    return re.sub(r"\s+"," ", (t or "").lower()).strip()
+    # split/join collapses whitespace runs in optimized C with no regex
+    # engine; multi-word skill patterns still match on single spaces
+    return " ".join((t or "").lower().split())
+
+def _skill_mask_of_normalized(t):
+    mask = 0
+    for end, s in SKILL_AC.iter(t):
+        start = end - len(s) + 1
+        # only accept matches on word boundaries ("java" should not hit "javascript")
+        if start > 0 and t[start-1].isalnum():
+            continue
+        if end + 1 < len(t) and t[end+1].isalnum():
+            continue
+        mask |= 1 << SKILL_IDX[s]
+    return mask
+
+@lru_cache(maxsize=4096)
+def _extract_skills_cached(h, text):
+    # h is a short digest of text: it makes cache-key hashing cheap for long
+    # documents; the text itself rides along for the scan on a miss
+    return tuple(sorted(mask_to_skills(_skill_mask_of_normalized(normalize_text(text)))))
 
 def extract_skills(text):
-    t = normalize_text(text)
-    found = set()
-    for s in SKILLS:
-        if s in t:
-            found.add(s)
-    return sorted(found)
+    text = text or ""
+    h = hashlib.blake2b(text.encode(), digest_size=8).digest()
+    return list(_extract_skills_cached(h, text))
 
 def tokenize(text):
-    text = normalize_text(text)
-    return re.findall(r"[a-z0-9\+]+", text)
+    # no normalize_text here: the token pattern already skips any separators
+    return _TOK_RE.findall((text or "").lower())
 
 def tf_vector(tokens):
-    v={}
-    for t in tokens:
-        v[t]=v.get(t,0)+1
-    return v
+    return Counter(tokens)
+
+def unit_tf(text):
+    """L2-normalized term-frequency vector; cosine against another unit
+    vector reduces to a plain dot product."""
+    tf = tf_vector(tokenize(text))
+    norm = math.sqrt(math.fsum(v*v for v in tf.values()))
+    if norm == 0:
+        return {}
+    return {k: v/norm for k,v in tf.items()}
+
+def dot_sim(a, b):
+    small, big = (a, b) if len(a) < len(b) else (b, a)
+    return sum(big.get(k,0.0)*v for k,v in small.items())
 
 def cosine_sim(a,b):
-    ta = tf_vector(tokenize(a))
-    tb = tf_vector(tokenize(b))
-    dot = sum(ta.get(k,0)*tb.get(k,0) for k in ta)
-    import math
-    na = math.sqrt(sum(v*v for v in ta.values()))
-    nb = math.sqrt(sum(v*v for v in tb.values()))
-    if na==0 or nb==0:
-        return 0.0
-    return dot/(na*nb)
-
-def compute_score(jd_text, resume_text, jd_sk, res_sk):
-    jdset = set([s.lower() for s in jd_sk])
-    resset = set([s.lower() for s in res_sk])
-    match = len(jdset & resset)
-    jdcount = max(1, len(jdset))
+    return dot_sim(unit_tf(a), unit_tf(b))
+
+def resume_unit_tf(r):
+    # norm == 1.0 marks a vector stored already normalized; rows written
+    # before normalization (or before the column existed) are rewritten here.
+    if r.tf_json is not None and r.norm == 1.0:
+        return json.loads(r.tf_json)
+    tf = unit_tf(r.text or "")
+    r.tf_json = json.dumps(tf); r.norm = 1.0
+    db.session.commit()
+    return tf
+
+def _simhash_of_tf(tf):
+    bits = [0]*64
+    for tok, cnt in tf.items():
+        h = int.from_bytes(hashlib.blake2b(tok.encode(), digest_size=8).digest(), "big")
+        for i in range(64):
+            bits[i] += cnt if (h >> i) & 1 else -cnt
+    return sum(1 << i for i in range(64) if bits[i] > 0)
+
+def simhash64(text):
+    """64-bit simhash of the token multiset. Hamming distance between two
+    signatures estimates similarity, so a full cosine is only worth running
+    on the nearest candidates."""
+    return _simhash_of_tf(tf_vector(tokenize(text)))
+
+def scan_text(text):
+    """Fused single pass over a document: normalize once, then derive the
+    unit TF vector, skill mask and simhash from that one string instead of
+    re-lowering/retokenizing for each artifact."""
+    t = normalize_text(text)
+    tf = tf_vector(_TOK_RE.findall(t))
+    norm = math.sqrt(math.fsum(v*v for v in tf.values()))
+    utf = {k: v/norm for k,v in tf.items()} if norm else {}
+    return utf, _skill_mask_of_normalized(t), _simhash_of_tf(tf)
+
+def resume_simhash(r):
+    # Precomputed at upload; legacy rows are backfilled on first use.
+    if r.simhash is None:
+        sig = simhash64(r.text or "")
+        r.simhash = format(sig, "x")
+        db.session.commit()
+        return sig
+    return int(r.simhash, 16)
+
+def resume_skill_mask(r):
+    # Precomputed at upload; legacy rows are backfilled on first use.
+    if r.skill_mask is None:
+        mask = skills_to_mask(extract_skills(r.text or ""))
+        r.skill_mask = format(mask, "x")
+        db.session.commit()
+        return mask
+    return int(r.skill_mask, 16)
+
+def compute_score(jd_text, resume_text, jd_mask, res_mask, sem=None):
+    match = (jd_mask & res_mask).bit_count()
+    jdcount = max(1, jd_mask.bit_count())
     skill_ratio = match / jdcount
-    sem = cosine_sim(jd_text, resume_text)
+    if sem is None:
+        sem = semantic_sim(jd_text, resume_text)
     score = 0.65*skill_ratio + 0.35*sem
     return round(score*100,1), round(skill_ratio*100,1), round(sem*100,1)
 
+# Sparse TF-IDF matrix over the stored resume corpus. Scoring a JD against
+# all resumes becomes one sparse matrix product in C instead of a Python
+# loop of dict dot products. Refit lazily whenever the corpus changes.
+VECTORIZER = None
+RESUME_MATRIX = None
+_MATRIX_IDS = None
+_MATRIX_VERSION = -1
+
+def ensure_resume_matrix(resumes=None):
+    """(Re)fit the corpus vectorizer if the corpus changed. Returns True
+    when a fitted matrix is available."""
+    global VECTORIZER, RESUME_MATRIX, _MATRIX_IDS, _MATRIX_VERSION
+    if resumes is None:
+        if _MATRIX_VERSION == RESUME_CACHE_VERSION:
+            return RESUME_MATRIX is not None
+        resumes = Resume.query.order_by(Resume.uploaded_at.desc()).all()
+    ids = [r.id for r in resumes]
+    if _MATRIX_VERSION != RESUME_CACHE_VERSION or _MATRIX_IDS != ids:
+        texts = [r.text or "" for r in resumes]
+        VECTORIZER = TfidfVectorizer(lowercase=True, token_pattern=r"[a-z0-9+]+")
+        try:
+            RESUME_MATRIX = VECTORIZER.fit_transform(texts)
+        except ValueError:  # no resumes, or nothing tokenizable
+            VECTORIZER = None; RESUME_MATRIX = None
+        _MATRIX_IDS = ids
+        _MATRIX_VERSION = RESUME_CACHE_VERSION
+    return RESUME_MATRIX is not None
+
+def semantic_scores(jd_text, resumes):
+    """Cosine similarity of the JD against each resume, as {resume_id: sim}."""
+    if not ensure_resume_matrix(resumes):
+        return {}
+    # TfidfVectorizer L2-normalizes rows, so cosine is a plain sparse product.
+    jd_vec = VECTORIZER.transform([jd_text])
+    sims = (RESUME_MATRIX @ jd_vec.T).toarray().ravel()
+    return dict(zip(_MATRIX_IDS, sims.tolist()))
+
+def semantic_sim(jd_text, resume_text):
+    """Single-pair similarity through the shared corpus vocabulary: both
+    texts project into the fitted TF-IDF space and the dot runs in C."""
+    if ensure_resume_matrix():
+        vecs = VECTORIZER.transform([jd_text, resume_text])
+        return float((vecs[0] @ vecs[1].T).toarray()[0, 0])
+    return cosine_sim(jd_text, resume_text)
+
+# Cache of (resume, JD) match results so re-submitting the same JD does not
+# rescore every stored resume. The version counter is bumped on upload so
+# stale entries for changed resumes are never served.
+RESUME_CACHE_VERSION = 0
+_JD_BY_HASH = {}
+
+# Above this corpus size the match route prefilters candidates by simhash
+# distance and scores only the nearest ones exactly.
+PREFILTER_LIMIT = 200
+
+def bump_resume_cache():
+    global RESUME_CACHE_VERSION
+    RESUME_CACHE_VERSION += 1
+
+@lru_cache(maxsize=256)
+def match_rows_cached(jd_hash, version):
+    """Scored, sorted result rows for one JD against the whole corpus.
+    Skill ratios and semantic scores combine in one NumPy expression;
+    a repeat submission of the same JD is a pure cache hit."""
+    jd_text, jd_sk, jd_tf = _JD_BY_HASH[jd_hash]
+    resumes = (Resume.query.options(load_only(Resume.filename, Resume.original_filename, Resume.uploaded_by,
+                                              Resume.uploaded_at, Resume.skill_mask, Resume.simhash))
+               .order_by(Resume.uploaded_at.desc()).all())
+    if not resumes:
+        return ()
+    prefiltered = len(resumes) > PREFILTER_LIMIT
+    if prefiltered:
+        # cull to the nearest candidates by simhash Hamming distance before
+        # paying for exact similarity on each one
+        jd_sig = simhash64(jd_text)
+        resumes = sorted(resumes, key=lambda r: (resume_simhash(r) ^ jd_sig).bit_count())[:PREFILTER_LIMIT]
+    # one bulk query for uploader emails instead of one query per resume
+    uploader_ids = {r.uploaded_by for r in resumes if r.uploaded_by}
+    uploader_emails = {u.id: u.email for u in User.query.filter(User.id.in_(uploader_ids)).all()} if uploader_ids else {}
+    jd_mask = skills_to_mask(jd_sk)
+    jdcount = max(1, jd_mask.bit_count())
+    res_masks = [resume_skill_mask(r) for r in resumes]
+    ratios = np.array([(jd_mask & m).bit_count()/jdcount for m in res_masks])
+    # on a prefiltered subset the dict dot products are cheap enough and the
+    # corpus-wide matrix must not be refit over a per-JD candidate set
+    sems = {} if prefiltered else semantic_scores(jd_text, resumes)
+    if sems:
+        sem_arr = np.array([sems[r.id] for r in resumes])
+    else:
+        # gather vectors serially (may touch the db session), then fan the
+        # session-free dot products out over a thread pool
+        res_tfs = [resume_unit_tf(r) for r in resumes]
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as ex:
+            sem_arr = np.array(list(ex.map(lambda tf: dot_sim(jd_tf, tf), res_tfs)))
+    final = 0.65*ratios + 0.35*sem_arr
+    order = np.argsort(-final, kind="stable")
+    rows = []
+    for i in order:
+        r = resumes[i]
+        res_sk = sorted(mask_to_skills(res_masks[i]))
+        rows.append({
+            "rid": r.id,
+            "filename": r.original_filename,
+            "uploader": uploader_emails.get(r.uploaded_by, "Unknown"),
+            "score": round(float(final[i])*100,1),
+            "skill_pct": round(float(ratios[i])*100,1),
+            "semantic_pct": round(float(sem_arr[i])*100,1),
+            "missing": sorted(mask_to_skills(jd_mask & ~res_masks[i])),
+            "res_sk": res_sk,
+            "uploaded_at": r.uploaded_at
+        })
+    return tuple(rows)
+
 def suggested_roadmap(missing, months=3):
     months = max(1,min(24,int(months)))
     base = [
@@ -168,13 +445,24 @@ def job_suggestions_from_skills(skills):
     if not jobs: jobs.add("Software Engineer (General)")
     return sorted(list(jobs))
 
+_EMAIL_RE = re.compile(r"[a-z0-9.\-_]+@[a-z0-9.\-]+\.[a-z]{2,}")
+_PHONE_RE = re.compile(r"\+?\d[\d\-\s]{7,}\d")
+_ATS_SECTIONS = ["experience","education","skills","projects"]
+_SECTION_AC = ahocorasick.Automaton()
+for sec in _ATS_SECTIONS:
+    _SECTION_AC.add_word(sec, sec)
+_SECTION_AC.make_automaton()
+
 def ats_checks(text):
     t = (text or "").lower()
     checks=[]
-    checks.append(("email", bool(re.search(r"[a-z0-9.\-_]+@[a-z0-9.\-]+\.[a-z]{2,}", t))))
-    checks.append(("phone", bool(re.search(r"\+?\d[\d\-\s]{7,}\d", t))))
-    for sec in ["experience","education","skills","projects"]:
-        checks.append((f"sec_{sec}", sec in t))
+    checks.append(("email", bool(_EMAIL_RE.search(t))))
+    checks.append(("phone", bool(_PHONE_RE.search(t))))
+    # all section headings found in one automaton pass instead of one
+    # substring search per section
+    hits = {s for _, s in _SECTION_AC.iter(t)}
+    for sec in _ATS_SECTIONS:
+        checks.append((f"sec_{sec}", sec in hits))
     checks.append(("length", len(text or "") >= 200))
     return checks
 
@@ -247,11 +535,18 @@ def seeker_dashboard():
         path = os.path.join(app.config["UPLOAD_FOLDER"], stored)
         f.save(path)
         text = extract_text_from_file(path, original)
-        r = Resume(filename=stored, original_filename=original, text=text, uploaded_by=current_user.id)
+        with open(path + ".txt", "w", encoding="utf-8") as tfh:
+            tfh.write(text)
+        utf, mask, sig = scan_text(text)
+        r = Resume(filename=stored, original_filename=original, uploaded_by=current_user.id,
+                   tf_json=json.dumps(utf), norm=1.0,
+                   skill_mask=format(mask, "x"), simhash=format(sig, "x"))
         db.session.add(r); db.session.commit()
+        bump_resume_cache()
         flash("Uploaded successfully", "success")
         return redirect(url_for("seeker_dashboard"))
-    resumes = Resume.query.filter_by(uploaded_by=current_user.id).order_by(Resume.uploaded_at.desc()).all()
+    resumes = (Resume.query.options(load_only(Resume.filename, Resume.original_filename, Resume.uploaded_at, Resume.uploaded_by))
+               .filter_by(uploaded_by=current_user.id).order_by(Resume.uploaded_at.desc()).all())
     return render_template("seeker.html", resumes=resumes)
 
 @app.route("/uploads/<path:filename>")
@@ -265,29 +560,28 @@ def uploaded_file(filename):
 def recruiter_dashboard():
     if current_user.role!="recruiter":
         flash("Access denied", "danger"); return redirect(url_for("index"))
-    recent = Resume.query.order_by(Resume.uploaded_at.desc()).limit(10).all()
+    recent = (Resume.query.options(load_only(Resume.filename, Resume.original_filename, Resume.uploaded_at, Resume.uploaded_by))
+              .order_by(Resume.uploaded_at.desc()).limit(10).all())
     return render_template("recruiter.html", recent=recent)
 
 def read_text_from_upload_fileobj(f):
     filename = f.filename or ""
     ext = filename.rsplit(".",1)[-1].lower() if "." in filename else ""
-    if ext=="txt":
-        try:
-            return f.read().decode("utf-8", errors="ignore")
-        except Exception:
-            return ""
-    elif ext=="docx":
+    if ext=="docx":
+        # docx needs a real file on disk: save once, extract, clean up
         tmp = os.path.join(app.config["UPLOAD_FOLDER"], "tmp_" + secure_filename(filename))
         f.save(tmp)
-        txt = extract_text_from_file(tmp, filename)
-        try: os.remove(tmp)
-        except: pass
-        return txt
-    else:
         try:
-            return f.read().decode("utf-8", errors="ignore")
-        except:
-            return ""
+            return extract_text_from_file(tmp, filename)
+        finally:
+            try: os.remove(tmp)
+            except OSError: pass
+    # stream-decode directly off the upload stream instead of reading the
+    # raw bytes into memory and decoding a second full-size copy
+    try:
+        return io.TextIOWrapper(f.stream, encoding="utf-8", errors="ignore").read()
+    except Exception:
+        return ""
 
 @app.route("/recruiter/match_jd", methods=["GET","POST"])
 @login_required
@@ -303,27 +597,12 @@ def recruiter_match_jd():
         if not jd_text:
             flash("Please paste a Job Description or upload a .txt/.docx JD file.", "warning")
             return redirect(url_for("recruiter_dashboard"))
-        rows=[]
-        resumes = Resume.query.order_by(Resume.uploaded_at.desc()).all()
-        for r in resumes:
-            resume_text = r.text or ""
-            jd_sk = extract_skills(jd_text)
-            res_sk = extract_skills(resume_text)
-            missing = sorted(list(set(jd_sk) - set(res_sk)))
-            score, skill_pct, sem_pct = compute_score(jd_text, resume_text, jd_sk, res_sk)
-            rows.append({
-                "rid": r.id,
-                "filename": r.original_filename,
-                "uploader": User.query.get(r.uploaded_by).email if r.uploaded_by else "Unknown",
-                "score": score,
-                "skill_pct": skill_pct,
-                "semantic_pct": sem_pct,
-                "missing": missing,
-                "res_sk": res_sk,
-                "uploaded_at": r.uploaded_at
-            })
-        rows.sort(key=lambda x: x["score"], reverse=True)
-        results = rows
+        jd_sk = extract_skills(jd_text)
+        jd_hash = hashlib.sha1(jd_text.encode()).hexdigest()
+        if len(_JD_BY_HASH) > 2048:
+            _JD_BY_HASH.clear()
+        _JD_BY_HASH[jd_hash] = (jd_text, tuple(jd_sk), unit_tf(jd_text))
+        results = list(match_rows_cached(jd_hash, RESUME_CACHE_VERSION))
     return render_template("recruiter_match.html", results=results, jd_text=jd_text)
 
 # Recruiter view + analyze single resume
@@ -339,11 +618,12 @@ def recruiter_view_resume(rid):
         months = int(request.form.get("months","3") or 3)
         resume_text = r.text or ""
         jd_sk = extract_skills(jd_text) if jd_text else []
-        res_sk = extract_skills(resume_text)
-        missing = sorted(list(set(jd_sk) - set(res_sk)))
-        extra = sorted(list(set(res_sk) - set(jd_sk)))
+        jd_mask = skills_to_mask(jd_sk); res_mask = resume_skill_mask(r)
+        res_sk = sorted(mask_to_skills(res_mask))
+        missing = sorted(mask_to_skills(jd_mask & ~res_mask))
+        extra = sorted(mask_to_skills(res_mask & ~jd_mask))
         ats = ats_checks(resume_text)
-        score, skill_pct, sem_pct = compute_score(jd_text, resume_text, jd_sk, res_sk)
+        score, skill_pct, sem_pct = compute_score(jd_text, resume_text, jd_mask, res_mask)
         timeline = suggested_roadmap(missing, months=months)
         jobs = job_suggestions_from_skills(res_sk)
         result = {"score":score,"skill_pct":skill_pct,"semantic_pct":sem_pct,"jd_sk":jd_sk,"res_sk":res_sk,"missing":missing,"extra":extra,"ats":ats,"timeline":timeline,"jobs":jobs,"months":months,"rid":rid,"filename":r.original_filename,"resume_text":resume_text,"jd_text":jd_text}
@@ -368,10 +648,11 @@ def analyze_stored(rid):
         months = int(request.form.get("months","3") or 3)
         resume_text = r.text or ""
         jd_sk = extract_skills(jd_text) if jd_text else []
-        res_sk = extract_skills(resume_text)
-        missing = sorted(list(set(jd_sk) - set(res_sk)))
+        jd_mask = skills_to_mask(jd_sk); res_mask = resume_skill_mask(r)
+        res_sk = sorted(mask_to_skills(res_mask))
+        missing = sorted(mask_to_skills(jd_mask & ~res_mask))
         ats = ats_checks(resume_text)
-        score, skill_pct, sem_pct = compute_score(jd_text, resume_text, jd_sk, res_sk)
+        score, skill_pct, sem_pct = compute_score(jd_text, resume_text, jd_mask, res_mask)
         roadmap = suggested_roadmap(missing, months=months)
         jobs = job_suggestions_from_skills(res_sk)
         result = {"score":score,"skill_pct":skill_pct,"semantic_pct":sem_pct,"jd_sk":jd_sk,"res_sk":res_sk,"missing":missing,"ats":ats,"roadmap":roadmap,"jobs":jobs,"rid":rid,"filename":r.original_filename,"months":months,"resume_text":resume_text,"jd_text":jd_text}
@@ -384,7 +665,7 @@ def analyze_stored(rid):
 @login_required
 def route_map(rid, months):
     r = Resume.query.get_or_404(rid)
-    missing = extract_skills(r.text or "")
+    missing = sorted(mask_to_skills(resume_skill_mask(r)))
     timeline = suggested_roadmap(missing, months=months)
     return render_template("route_map.html", resume=r, timeline=timeline, months=months)
 
@@ -392,7 +673,7 @@ def route_map(rid, months):
 @login_required
 def job_suggestions(rid):
     r = Resume.query.get_or_404(rid)
-    suggestions = job_suggestions_from_skills(extract_skills(r.text or ""))
+    suggestions = job_suggestions_from_skills(mask_to_skills(resume_skill_mask(r)))
     return render_template("job_suggestions.html", resume=r, suggestions=suggestions)
 
 @app.route("/ats-improvement/<int:rid>")